@@ -1,14 +1,18 @@
 import os
+import sys
 import json
+import atexit
 from langchain.tools import tool
 from langchain.agents import create_agent
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import HumanMessage, AIMessage
 from models.schemas import FundamentalAnalysis, ProfileStatus
 from dotenv import load_dotenv
 from tools.profile_management import check_profile_exists, load_profile, save_profile
 from tools.fundamental_analysis import fetch_yahoo_analyst_forecast, fetch_fundamental_data
-from conversation_formatter.formatter import print_turn_history, get_response_text
+from conversation_formatter.formatter import TraceRenderer, get_response_text
 from prompt import get_orchestrator_prompt, get_fundamental_analyst_prompt, get_profile_manager_prompt
+from response_cache.cache import ResponseCache, read_profile, profile_fingerprint
 
 load_dotenv()
 
@@ -77,6 +81,22 @@ print("Investment Agent ready. Type 'exit' to quit.\n")
 conversation_history = []
 turn_number = 0
 
+# Trace output: TRACE_FORMAT=jsonl for log shipping, to TRACE_FILE or stderr
+# so it never mixes with the interactive prompt and responses on stdout
+trace_format = os.getenv("TRACE_FORMAT", "text")
+trace_file = os.getenv("TRACE_FILE")
+if trace_file:
+    trace_stream = open(trace_file, "a", encoding="utf-8")
+    atexit.register(trace_stream.close)
+elif trace_format == "jsonl":
+    trace_stream = sys.stderr
+else:
+    trace_stream = None
+trace_renderer = TraceRenderer(mode=trace_format, stream=trace_stream)
+
+# Cache of answers to near-duplicate questions, shared across sessions
+response_cache = ResponseCache()
+
 while True:
     user_input = input("> ")
 
@@ -89,14 +109,26 @@ while True:
     # Add user message to history
     conversation_history.append({"role": "user", "content": user_input})
 
-    # Send full history to agent
-    result = agent.invoke({"messages": conversation_history})
+    # Serve near-duplicate questions from cache, keyed on the current profile buckets
+    profile = read_profile()
+    response = response_cache.get(user_input, profile)
+
+    if response is not None:
+        result = {"messages": [HumanMessage(content=user_input), AIMessage(content=response)]}
+        trace_renderer.render(result, turn_number, cached=True)
+    else:
+        # Send full history to agent
+        result = agent.invoke({"messages": conversation_history})
+
+        # Print execution trace with tool history
+        trace_renderer.render(result, turn_number)
 
-    # Print execution trace with tool history
-    print_turn_history(result, turn_number)
+        # Extract AI response
+        response = get_response_text(result)
 
-    # Extract AI response
-    response = get_response_text(result)
+        # Don't cache under a stale fingerprint if the turn updated the profile
+        if profile_fingerprint(read_profile()) == profile_fingerprint(profile):
+            response_cache.put(user_input, response, profile)
 
     # Add AI response to history
     conversation_history.append({"role": "assistant", "content": response})
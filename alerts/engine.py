@@ -0,0 +1,373 @@
+"""
+Price alert and threshold-monitoring engine.
+
+Rules are kept in an index keyed by ticker, so a price or score update for one
+ticker only evaluates the rules that watch it. A shared polling loop fetches
+each indexed ticker once per tick regardless of how many users hold it, and
+the LLM is only called to explain alerts that actually fired.
+
+Usage:
+    python -m alerts.engine --interval 300
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from dotenv import load_dotenv
+from langchain_google_genai import ChatGoogleGenerativeAI
+from models.schemas import AlertRule, AlertType, FiredAlert, UserProfile
+from tools.profile_management import DATA_DIR, PROFILE_PATH, PROFILES_DIR, load_all_profiles, normalize_ticker
+from tools.rate_limit import RateLimiter, call_with_rate_limit
+from tools.fundamental_analysis import fetch_yahoo_analyst_forecast
+from batch_review.runner import load_latest_scores
+from prompt import get_alert_explainer_prompt
+
+ALERTS_DIR = DATA_DIR / "alerts"
+RULES_PATH = ALERTS_DIR / "rules.json"
+STATE_PATH = ALERTS_DIR / "state.json"
+FIRED_PATH = ALERTS_DIR / "fired.jsonl"
+
+# Fundamental score bands: (lowest score in band, label)
+SCORE_BANDS = [(0, "weak"), (4, "neutral"), (7, "strong")]
+
+
+def score_band(score: int) -> int:
+    """Index of the band a 0-10 fundamental score falls into."""
+    band = 0
+    for index, (lowest, _) in enumerate(SCORE_BANDS):
+        if score >= lowest:
+            band = index
+    return band
+
+
+# -----------------------------
+# Rules
+# -----------------------------
+
+def build_default_rules(profiles: dict[str, UserProfile]) -> list[AlertRule]:
+    """Default rules for every holding: analyst target cross, drawdown past risk tolerance, score band drop."""
+    rules = []
+    for user_id, profile in profiles.items():
+        for holding in profile.current_holdings or []:
+            ticker = normalize_ticker(holding.ticker)
+            rules.append(AlertRule(user_id=user_id, ticker=ticker, alert_type=AlertType.TARGET_CROSS, is_default=True))
+            rules.append(AlertRule(user_id=user_id, ticker=ticker, alert_type=AlertType.SCORE_BAND_DROP, is_default=True))
+            # Drawdown is measured from the purchase price, so it needs one
+            if holding.purchase_price is not None:
+                rules.append(AlertRule(
+                    user_id=user_id,
+                    ticker=ticker,
+                    alert_type=AlertType.DRAWDOWN,
+                    threshold=profile.risk_tolerance,
+                    reference_price=holding.purchase_price,
+                    is_default=True,
+                ))
+    return rules
+
+
+def rule_key(rule: AlertRule) -> tuple:
+    """
+    Identity of a rule. The reference price separates drawdown rules for
+    several lots of the same ticker bought at different prices.
+    """
+    return (rule.user_id, rule.ticker, rule.alert_type, rule.reference_price)
+
+
+def merge_rules(rules: list[AlertRule], profiles: dict[str, UserProfile], keep_users: set[str] | None = None) -> list[AlertRule]:
+    """
+    Reconcile persisted rules with current profiles, keyed on rule_key.
+
+    Default rules are regenerated from current holdings, so new users/holdings
+    get monitored and drawdown thresholds follow the current risk_tolerance.
+    Custom rules (is_default False) are kept and override a default with the
+    same key. Rules for holdings that no longer exist are dropped, except for
+    users in keep_users (e.g. whose profile failed to load this time).
+    """
+    keep_users = keep_users or set()
+    held = {
+        (user_id, normalize_ticker(holding.ticker))
+        for user_id, profile in profiles.items()
+        for holding in profile.current_holdings or []
+    }
+    merged = {rule_key(rule): rule for rule in build_default_rules(profiles)}
+    for rule in rules:
+        if rule.user_id in keep_users or (not rule.is_default and (rule.user_id, rule.ticker) in held):
+            merged[rule_key(rule)] = rule
+    return list(merged.values())
+
+
+def add_custom_rule(rule: AlertRule) -> None:
+    """Persist a custom per-user rule, replacing any persisted rule with the same key."""
+    rule = rule.model_copy(update={"ticker": normalize_ticker(rule.ticker), "is_default": False})
+    rules = [existing for existing in load_rules() if rule_key(existing) != rule_key(rule)]
+    save_rules(rules + [rule])
+
+
+def load_rules() -> list[AlertRule]:
+    """Load persisted rules, or an empty list if none were saved yet."""
+    if not RULES_PATH.exists():
+        return []
+    with open(RULES_PATH, "r") as file:
+        return [AlertRule(**data) for data in json.load(file)]
+
+
+def save_rules(rules: list[AlertRule]) -> None:
+    """Persist rules to data/alerts/rules.json."""
+    ALERTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(RULES_PATH, "w") as file:
+        json.dump([rule.model_dump(mode="json") for rule in rules], file, indent=4)
+
+
+def load_state() -> dict:
+    """Load persisted engine state, or an empty state if missing/corrupted."""
+    if not STATE_PATH.exists():
+        return {}
+    try:
+        with open(STATE_PATH, "r") as file:
+            return json.load(file)
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_state(state: dict) -> None:
+    """Atomically persist engine state to data/alerts/state.json."""
+    ALERTS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(state, file, indent=4)
+    os.replace(tmp_path, STATE_PATH)
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+
+class AlertEngine:
+    """
+    Evaluates rules incrementally. Conditions fire once per crossing; the last
+    price and score band per ticker, and which drawdown rules are currently
+    past their limit, can be persisted so restarts neither lose nor repeat alerts.
+    """
+
+    def __init__(self, rules: list[AlertRule] | None = None, state: dict | None = None):
+        self._index: dict[str, list[AlertRule]] = defaultdict(list)
+        self._last_price: dict[str, float] = dict((state or {}).get("last_price", {}))
+        self._last_band: dict[str, int] = dict((state or {}).get("last_band", {}))
+        self._in_drawdown: set[str] = set((state or {}).get("in_drawdown", []))
+        for rule in rules or []:
+            self.add_rule(rule)
+
+    def state(self) -> dict:
+        """Per-ticker state to persist between runs."""
+        return {
+            "last_price": dict(self._last_price),
+            "last_band": dict(self._last_band),
+            "in_drawdown": sorted(self._in_drawdown),
+        }
+
+    def add_rule(self, rule: AlertRule) -> None:
+        self._index[rule.ticker].append(rule)
+
+    def remove_user(self, user_id: str) -> None:
+        """Drop all rules of one user, and tickers nobody watches anymore."""
+        for ticker in list(self._index):
+            self._index[ticker] = [rule for rule in self._index[ticker] if rule.user_id != user_id]
+            if not self._index[ticker]:
+                del self._index[ticker]
+
+    def tickers(self) -> list[str]:
+        """Tickers with at least one rule - the only ones worth polling."""
+        return list(self._index)
+
+    def rules(self) -> list[AlertRule]:
+        return [rule for rules in self._index.values() for rule in rules]
+
+    def on_price(self, ticker: str, price: float, target_mean: float | None = None) -> list[FiredAlert]:
+        """
+        Evaluate the price rules of one ticker.
+
+        Target crosses need a previous price, so the first price only seeds
+        them. Drawdown is a level condition tracked per rule: it fires the
+        first time a rule sees the price past its limit (including the very
+        first price) and re-arms once the price recovers.
+        """
+        rules = self._index.get(ticker, [])
+        previous = self._last_price.get(ticker)
+        self._last_price[ticker] = price
+
+        fired = []
+        for rule in rules:
+            if rule.alert_type == AlertType.TARGET_CROSS and target_mean is not None and previous is not None:
+                if previous < target_mean <= price:
+                    fired.append(self._fire(rule, f"{ticker} rose to {price:.2f}, crossing the analyst mean target {target_mean:.2f}"))
+                elif previous > target_mean >= price:
+                    fired.append(self._fire(rule, f"{ticker} fell to {price:.2f}, crossing the analyst mean target {target_mean:.2f}"))
+
+            elif rule.alert_type == AlertType.DRAWDOWN:
+                limit = rule.reference_price * (1 - rule.threshold / 100)
+                key = f"{rule.user_id}|{rule.ticker}|{rule.reference_price}"
+                if price > limit:
+                    self._in_drawdown.discard(key)
+                elif key not in self._in_drawdown:
+                    self._in_drawdown.add(key)
+                    drawdown = (1 - price / rule.reference_price) * 100
+                    fired.append(self._fire(
+                        rule,
+                        f"{ticker} at {price:.2f} is down {drawdown:.1f}% from purchase price "
+                        f"{rule.reference_price:.2f}, past the {rule.threshold:.1f}% risk tolerance",
+                    ))
+        return fired
+
+    def on_score(self, ticker: str, score: int) -> list[FiredAlert]:
+        """Evaluate score band rules of one ticker. The first score seen only seeds state."""
+        band = score_band(score)
+        previous = self._last_band.get(ticker)
+        self._last_band[ticker] = band
+        if previous is None or band >= previous:
+            return []
+
+        message = (
+            f"{ticker} fundamental score dropped to {score}, "
+            f"from the {SCORE_BANDS[previous][1]} band to {SCORE_BANDS[band][1]}"
+        )
+        return [
+            self._fire(rule, message)
+            for rule in self._index.get(ticker, [])
+            if rule.alert_type == AlertType.SCORE_BAND_DROP
+        ]
+
+    @staticmethod
+    def _fire(rule: AlertRule, message: str) -> FiredAlert:
+        return FiredAlert(rule=rule, fired_at=datetime.now().isoformat(timespec="seconds"), message=message)
+
+
+# -----------------------------
+# Polling
+# -----------------------------
+
+def explain_alert(alert: FiredAlert, profile: UserProfile | None, model, limiter: RateLimiter) -> str:
+    """Ask the LLM to explain one fired alert in the context of the user's profile."""
+    context = {"alert_type": alert.rule.alert_type.value, "ticker": alert.rule.ticker, "trigger": alert.message}
+    if profile is not None:
+        context["risk_tolerance"] = profile.risk_tolerance
+        context["time_horizon"] = profile.time_horizon
+    messages = [("system", get_alert_explainer_prompt()), ("human", json.dumps(context))]
+    response = call_with_rate_limit(limiter, model.invoke, messages)
+    return response.content if isinstance(response.content, str) else str(response.content)
+
+
+def poll_once(engine: AlertEngine, scores: dict[str, int] | None = None) -> list[FiredAlert]:
+    """One tick: fetch each watched ticker once and evaluate only its rules."""
+    fired = []
+    for ticker in engine.tickers():
+        forecast = fetch_yahoo_analyst_forecast.invoke({"ticker": ticker}) or {}
+        price = forecast.get("current")
+        if price is not None:
+            fired.extend(engine.on_price(ticker, price, forecast.get("mean")))
+        if scores and ticker in scores:
+            fired.extend(engine.on_score(ticker, scores[ticker]))
+    return fired
+
+
+def record_alerts(alerts: list[FiredAlert]) -> None:
+    """Append fired alerts to data/alerts/fired.jsonl."""
+    ALERTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(FIRED_PATH, "a") as file:
+        for alert in alerts:
+            file.write(json.dumps(alert.model_dump(mode="json")) + "\n")
+
+
+def watched_files_signature() -> tuple:
+    """Modification times of the profile and rule files; changes trigger a rule re-sync."""
+    paths = [PROFILE_PATH, RULES_PATH]
+    if PROFILES_DIR.exists():
+        paths.extend(sorted(PROFILES_DIR.glob("*.json")))
+    return tuple((str(path), path.stat().st_mtime) for path in paths if path.exists())
+
+
+def sync_rules(engine: AlertEngine) -> dict[str, UserProfile]:
+    """Reload profiles, merge and persist rules, and swap them into the engine. Returns the profiles."""
+    profiles, errors = load_all_profiles()
+    for user_id, error in errors.items():
+        print(f"Skipping profile '{user_id}': {error}")
+
+    rules = merge_rules(load_rules(), profiles, keep_users=set(errors))
+    save_rules(rules)
+    for user_id in {rule.user_id for rule in engine.rules()}:
+        engine.remove_user(user_id)
+    for rule in rules:
+        engine.add_rule(rule)
+    return profiles
+
+
+def run_monitor(interval_seconds: float = 300.0, requests_per_minute: float = 20.0, explain: bool = True) -> None:
+    """Poll all watched tickers on a shared schedule until interrupted, re-syncing rules when profiles change."""
+    engine = AlertEngine(state=load_state())
+    model = ChatGoogleGenerativeAI(model="gemini-2.5-pro") if explain else None
+    limiter = RateLimiter(requests_per_minute)
+    signature = None
+
+    while True:
+        started = time.monotonic()
+        if watched_files_signature() != signature:
+            profiles = sync_rules(engine)
+            # Taken after sync_rules, whose own save_rules must not trigger another sync
+            signature = watched_files_signature()
+            print(f"Monitoring {len(engine.tickers())} tickers with {len(engine.rules())} rules every {interval_seconds:.0f}s")
+
+        fired = poll_once(engine, load_latest_scores())
+
+        for alert in fired:
+            if model is not None:
+                try:
+                    alert.explanation = explain_alert(alert, profiles.get(alert.rule.user_id), model, limiter)
+                except Exception as e:
+                    alert.explanation = f"(Explanation unavailable: {str(e)})"
+            print(f"🔔 [{alert.rule.user_id}] {alert.message}")
+            if alert.explanation:
+                print(f"  └─ {alert.explanation}")
+        if fired:
+            record_alerts(fired)
+        save_state(engine.state())
+
+        time.sleep(max(0.0, interval_seconds - (time.monotonic() - started)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monitor holdings and fire price/threshold alerts.")
+    parser.add_argument("--interval", type=float, default=300.0, help="Seconds between polling ticks")
+    parser.add_argument("--rpm", type=float, default=20.0, help="Max LLM explanation requests per minute")
+    parser.add_argument("--no-explain", action="store_true", help="Fire alerts without LLM explanations")
+    parser.add_argument("--rebuild-rules", action="store_true", help="Discard persisted rules, including custom ones")
+    parser.add_argument("--add-rule", nargs=3, metavar=("USER_ID", "TICKER", "TYPE"),
+                        help="Add a custom rule and exit; TYPE is one of: " + ", ".join(t.name.lower() for t in AlertType))
+    parser.add_argument("--threshold", type=float, help="Drawdown percent for a custom drawdown rule")
+    parser.add_argument("--reference-price", type=float, help="Reference (purchase) price for a custom drawdown rule")
+    args = parser.parse_args()
+
+    if args.add_rule:
+        user_id, ticker, alert_type = args.add_rule
+        try:
+            add_custom_rule(AlertRule(
+                user_id=user_id,
+                ticker=ticker,
+                alert_type=AlertType[alert_type.upper()],
+                threshold=args.threshold,
+                reference_price=args.reference_price,
+            ))
+        except (KeyError, ValueError) as e:
+            parser.error(f"Invalid rule: {str(e)}")
+        print(f"Added {alert_type} rule for {user_id} on {ticker.upper()}")
+        return
+
+    load_dotenv()
+    if args.rebuild_rules:
+        save_rules([])
+    run_monitor(args.interval, args.rpm, explain=not args.no_explain)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Nightly batch portfolio review.
+
+Reviews the holdings of every stored profile without going through the
+interactive orchestrator loop. Tickers are deduplicated across users, so each
+unique ticker is fetched and scored once, and the results are fanned back out
+into per-user reports.
+
+Usage:
+    python -m batch_review.runner --run-id 2026-01-31 --workers 4 --rpm 20
+"""
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain_google_genai import ChatGoogleGenerativeAI
+from models.schemas import FundamentalAnalysis, Holdings, HoldingReview, PortfolioReport, SecurityType, UserProfile
+from tools.profile_management import DATA_DIR, load_all_profiles, normalize_ticker
+from tools.rate_limit import RateLimiter, call_with_rate_limit
+from tools.fundamental_analysis import fetch_fundamental_data, fetch_yahoo_analyst_forecast
+from prompt import get_fundamental_analyst_prompt
+
+REVIEWS_DIR = DATA_DIR / "reviews"
+
+# Only these have the company fundamentals the analyst prompt scores; bonds,
+# funds and crypto would be "scored" on empty data
+SCORED_SECURITY_TYPES = {SecurityType.STOCK, SecurityType.ETF}
+
+
+# -----------------------------
+# Checkpointing
+# -----------------------------
+
+class Checkpoint:
+    """
+    Per-ticker progress of a run, stored as an append-only JSON lines file.
+
+    Each completed ticker appends one line, so checkpoint I/O stays constant
+    per ticker. When read back, the last line for a ticker wins.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.tickers: dict[str, dict] = {}
+        if path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        """Read complete lines and truncate a partial last line left by a crash mid-append."""
+        with open(self.path, "rb") as file:
+            content = file.read()
+        complete = content[:content.rfind(b"\n") + 1]
+        if len(complete) != len(content):
+            # Otherwise the next append would be glued onto the partial line
+            with open(self.path, "r+b") as file:
+                file.truncate(len(complete))
+
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+                self.tickers[entry["ticker"]] = entry
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+
+    def is_done(self, ticker: str) -> bool:
+        """Only successful analyses are skipped on resume; failures are retried."""
+        return self.tickers.get(ticker, {}).get("analysis") is not None
+
+    def record(self, ticker: str, entry: dict) -> None:
+        """Store a ticker result and append it to the checkpoint file."""
+        entry = {"ticker": ticker, **entry}
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self.tickers[ticker] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as file:
+                file.write(line)
+
+
+# -----------------------------
+# Ticker review
+# -----------------------------
+
+def is_scored(holding: Holdings) -> bool:
+    """Whether a holding's security type is covered by fundamental scoring."""
+    return holding.security_type in SCORED_SECURITY_TYPES
+
+
+def collect_unique_tickers(profiles: dict[str, UserProfile]) -> list[str]:
+    """Union of scorable held tickers across all profiles, in stable order."""
+    tickers = set()
+    for profile in profiles.values():
+        for holding in profile.current_holdings or []:
+            if is_scored(holding):
+                tickers.add(normalize_ticker(holding.ticker))
+    return sorted(tickers)
+
+
+def build_scoring_model():
+    """Fundamental analyst model returning FundamentalAnalysis directly from pre-fetched data."""
+    model = ChatGoogleGenerativeAI(model="gemini-2.5-pro")
+    return model.with_structured_output(FundamentalAnalysis)
+
+
+def review_ticker(ticker: str, scoring_model, limiter: RateLimiter) -> dict:
+    """
+    Fetch data for one ticker once and score it with a single LLM call.
+
+    Only the price and analysis are returned for the checkpoint; raw
+    fundamentals are used for the prompt and then dropped.
+    """
+    fundamentals = fetch_fundamental_data.invoke({"ticker": ticker})
+    if "error" in fundamentals:
+        return {"current_price": None, "analysis": None, "error": fundamentals["error"]}
+    # Unknown symbols come back as a dict of Nones rather than an error
+    if all(value is None for key, value in fundamentals.items() if key != "ticker"):
+        return {"current_price": None, "analysis": None, "error": f"No fundamental data available for {ticker}"}
+
+    forecast = fetch_yahoo_analyst_forecast.invoke({"ticker": ticker}) or {}
+    if "error" in forecast:
+        forecast = {}
+
+    query = json.dumps({"ticker": ticker, "fundamentals": fundamentals, "analyst_forecast": forecast}, default=str)
+    messages = [
+        ("system", get_fundamental_analyst_prompt()),
+        ("human", f"Analyze the following pre-fetched data. Do not request more data.\n{query}"),
+    ]
+    analysis = call_with_rate_limit(limiter, scoring_model.invoke, messages)
+    return {"current_price": fundamentals.get("current_price"), "analysis": analysis.model_dump(), "error": None}
+
+
+def review_tickers(tickers: list[str], checkpoint: Checkpoint, workers: int, requests_per_minute: float) -> None:
+    """Review all pending tickers through a bounded worker pool, checkpointing each result."""
+    pending = [ticker for ticker in tickers if not checkpoint.is_done(ticker)]
+    print(f"{len(tickers)} unique tickers, {len(tickers) - len(pending)} already done, {len(pending)} pending")
+    if not pending:
+        return
+
+    scoring_model = build_scoring_model()
+    limiter = RateLimiter(requests_per_minute)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(review_ticker, ticker, scoring_model, limiter): ticker for ticker in pending}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                entry = {"current_price": None, "analysis": None, "error": f"Review failed: {str(e)}"}
+            checkpoint.record(ticker, entry)
+            status = "ok" if entry["analysis"] else f"error: {entry['error']}"
+            print(f"  {ticker}: {status}")
+
+
+# -----------------------------
+# Per-user reports
+# -----------------------------
+
+def build_report(user_id: str, profile: UserProfile, run_id: str, results: dict[str, dict]) -> PortfolioReport:
+    """Fan shared ticker results back out into one user's report."""
+    holdings = []
+    for holding in profile.current_holdings or []:
+        ticker = normalize_ticker(holding.ticker)
+        if not is_scored(holding):
+            holdings.append(HoldingReview(
+                ticker=ticker,
+                security_type=holding.security_type,
+                quantity=holding.quantity,
+                purchase_price=holding.purchase_price,
+                error=f"Not reviewed: {holding.security_type.value} holdings are not covered by fundamental analysis",
+            ))
+            continue
+
+        entry = results.get(ticker, {})
+        current_price = entry.get("current_price")
+
+        unrealized_return_pct = None
+        if current_price and holding.purchase_price:
+            unrealized_return_pct = round((current_price / holding.purchase_price - 1) * 100, 2)
+
+        holdings.append(HoldingReview(
+            ticker=ticker,
+            security_type=holding.security_type,
+            quantity=holding.quantity,
+            purchase_price=holding.purchase_price,
+            current_price=current_price,
+            unrealized_return_pct=unrealized_return_pct,
+            analysis=entry.get("analysis"),
+            error=entry.get("error") or (None if entry else "Ticker was not reviewed"),
+        ))
+
+    return PortfolioReport(
+        user_id=user_id,
+        run_id=run_id,
+        generated_at=datetime.now().isoformat(timespec="seconds"),
+        risk_tolerance=profile.risk_tolerance,
+        time_horizon=profile.time_horizon,
+        holdings=holdings,
+    )
+
+
+def write_reports(profiles: dict[str, UserProfile], run_id: str, results: dict[str, dict], reports_dir: Path) -> None:
+    """Write one JSON report per user."""
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    for user_id, profile in profiles.items():
+        report = build_report(user_id, profile, run_id, results)
+        with open(reports_dir / f"{user_id}.json", "w") as file:
+            json.dump(report.model_dump(mode="json"), file, indent=4)
+
+
+def load_latest_scores() -> dict[str, int]:
+    """Fundamental scores per ticker from the most recent run's checkpoint."""
+    if not REVIEWS_DIR.exists():
+        return {}
+    checkpoints = sorted(REVIEWS_DIR.glob("*/checkpoint.jsonl"), key=lambda path: path.stat().st_mtime)
+    if not checkpoints:
+        return {}
+    try:
+        tickers = Checkpoint(checkpoints[-1]).tickers
+        return {ticker: entry["analysis"]["score"] for ticker, entry in tickers.items() if entry.get("analysis")}
+    except (OSError, json.JSONDecodeError, KeyError, TypeError):
+        # Called on every alert tick; a bad checkpoint must not kill the monitor
+        return {}
+
+
+def run_batch_review(run_id: str, workers: int = 4, requests_per_minute: float = 20.0) -> Path:
+    """Review all stored profiles. Re-running the same run_id resumes from its checkpoint."""
+    run_dir = REVIEWS_DIR / run_id
+
+    profiles, errors = load_all_profiles()
+    for user_id, error in errors.items():
+        print(f"Skipping profile '{user_id}': {error}")
+
+    checkpoint = Checkpoint(run_dir / "checkpoint.jsonl")
+    review_tickers(collect_unique_tickers(profiles), checkpoint, workers, requests_per_minute)
+
+    write_reports(profiles, run_id, checkpoint.tickers, run_dir / "reports")
+    print(f"Wrote {len(profiles)} reports to {run_dir / 'reports'}")
+    return run_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Review holdings of every stored profile.")
+    parser.add_argument("--run-id", default=date.today().isoformat(), help="Run id; reuse it to resume a crashed run")
+    parser.add_argument("--workers", type=int, default=4, help="Max concurrent ticker reviews")
+    parser.add_argument("--rpm", type=float, default=20.0, help="Max LLM requests per minute across all workers")
+    args = parser.parse_args()
+
+    load_dotenv()
+    run_batch_review(args.run_id, workers=args.workers, requests_per_minute=args.rpm)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,193 @@
 import json
+import re
+import sys
 
-def trim_text(text: str, max_words: int = 30) -> str:
+_WORD = re.compile(r"\S+")
+
+# Compact encoder for JSONL, indented one for the human-readable trace.
+# iterencode yields chunks lazily, so serialization of large tool args stops once
+# enough words are seen. A single large string value is still encoded as one chunk.
+_COMPACT_ENCODER = json.JSONEncoder(default=str)
+_INDENT_ENCODER = json.JSONEncoder(indent=2, default=str)
+
+
+def _take_words(chunks, max_words: int) -> tuple[list[str], bool]:
+    """
+    Collect up to max_words words from an iterable of text chunks.
+
+    Stops reading as soon as one word past the limit is seen, so the cost is
+    bounded by max_words rather than by the size of the input.
+    """
+    words = []
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        carry = ""
+        for match in _WORD.finditer(text):
+            # A word touching the end of the chunk may continue in the next one
+            if match.end() == len(text):
+                carry = match.group()
+                break
+            words.append(match.group())
+            if len(words) > max_words:
+                return words[:max_words], True
+    if carry:
+        words.append(carry)
+    if len(words) > max_words:
+        return words[:max_words], True
+    return words, False
+
+
+def _content_chunks(content):
+    """Yield text chunks of message content (plain string or list of content parts)."""
+    if isinstance(content, str):
+        yield content
+    elif isinstance(content, list):
+        for part in content:
+            if isinstance(part, str):
+                yield part
+            elif isinstance(part, dict) and part.get("text"):
+                yield part["text"]
+            yield " "
+    elif content:
+        yield str(content)
+
+
+def trim_text(text, max_words: int = 30) -> str:
     """Trim text to max_words, adding ellipsis if truncated."""
     if not text:
         return ""
-    words = str(text).split()
-    if len(words) <= max_words:
-        return str(text)
-    return " ".join(words[:max_words]) + "..."
+    if isinstance(text, str):
+        words, truncated = _take_words((text,), max_words)
+        return " ".join(words) + "..." if truncated else text
+    words, truncated = _take_words(_content_chunks(text), max_words)
+    return " ".join(words) + ("..." if truncated else "")
 
 
-def print_turn_history(result: dict, turn_number: int) -> None:
-    """Print a beautifully formatted history of the agent's turn."""
-    messages = result.get("messages", [])
+def _trim_args(tool_args: dict, encoder: json.JSONEncoder, max_words: int) -> str:
+    """Serialize tool args only as far as needed to show max_words."""
+    if not tool_args:
+        return "(no args)"
+    chunks = []
+
+    def consumed():
+        for chunk in encoder.iterencode(tool_args):
+            chunks.append(chunk)
+            yield chunk
+
+    words, truncated = _take_words(consumed(), max_words)
+    if truncated:
+        return " ".join(words) + "..."
+    return "".join(chunks)
+
 
-    print(f"\n{'='*60}")
-    print(f"  TURN {turn_number} - EXECUTION TRACE")
-    print(f"{'='*60}")
-
-    step = 1
-    for msg in messages:
-        msg_type = type(msg).__name__
-
-        # User message
-        if msg_type == "HumanMessage":
-            print(f"\n[Step {step}] 👤 USER INPUT")
-            print(f"  └─ {trim_text(msg.content)}")
-            step += 1
-
-        # AI message (may contain tool calls)
-        elif msg_type == "AIMessage":
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                print(f"\n[Step {step}] 🤖 AI TOOL CALLS")
-                for call in msg.tool_calls:
-                    tool_name = call.get("name", "unknown")
-                    tool_args = call.get("args", {})
-                    args_str = json.dumps(tool_args, indent=2) if tool_args else "(no args)"
-                    print(f"  ├─ Tool: {tool_name}")
-                    print(f"  └─ Args: {trim_text(args_str)}")
+class TraceRenderer:
+    """
+    Incremental renderer for agent execution traces.
+
+    Only the messages of the current turn are formatted: the agent result holds
+    the whole conversation, so the renderer walks back from the end to the
+    latest user message instead of re-formatting the full history every turn.
+
+    Modes:
+        - "text": human-readable trace (same layout as print_turn_history)
+        - "jsonl": one JSON object per step, for log shipping
+    """
+
+    def __init__(self, mode: str = "text", stream=None, max_words: int = 30):
+        if mode not in {"text", "jsonl"}:
+            raise ValueError(f"Unknown trace mode: {mode}")
+        self.mode = mode
+        self.stream = stream
+        self.max_words = max_words
+
+    @staticmethod
+    def _turn_start(messages: list) -> int:
+        """Index of the latest user message, found by scanning back from the end."""
+        for index in range(len(messages) - 1, -1, -1):
+            if type(messages[index]).__name__ == "HumanMessage":
+                return index
+        return 0
+
+    def _steps(self, messages: list, cached: bool):
+        """Yield (step, kind, tool_name, text) for the given messages."""
+        encoder = _COMPACT_ENCODER if self.mode == "jsonl" else _INDENT_ENCODER
+        step = 1
+        for msg in messages:
+            msg_type = type(msg).__name__
+
+            # User message
+            if msg_type == "HumanMessage":
+                yield step, "user_input", None, trim_text(msg.content, self.max_words)
                 step += 1
-            elif msg.content:
-                print(f"\n[Step {step}] 🤖 AI RESPONSE")
-                print(f"  └─ {trim_text(msg.content)}")
+
+            # AI message (may contain tool calls)
+            elif msg_type == "AIMessage":
+                if getattr(msg, "tool_calls", None):
+                    for call in msg.tool_calls:
+                        args = _trim_args(call.get("args", {}), encoder, self.max_words)
+                        yield step, "tool_call", call.get("name", "unknown"), args
+                    step += 1
+                elif msg.content:
+                    kind = "cached_response" if cached else "ai_response"
+                    yield step, kind, None, trim_text(msg.content, self.max_words)
+                    step += 1
+
+            # Tool response
+            elif msg_type == "ToolMessage":
+                yield step, "tool_result", getattr(msg, "name", "unknown"), trim_text(msg.content, self.max_words)
                 step += 1
 
-        # Tool response
-        elif msg_type == "ToolMessage":
-            tool_name = getattr(msg, "name", "unknown")
-            print(f"\n[Step {step}] 🔧 TOOL RESULT [{tool_name}]")
-            print(f"  └─ {trim_text(msg.content)}")
-            step += 1
+    def render(self, result: dict, turn_number: int, cached: bool = False) -> None:
+        """Render the current turn of an agent result."""
+        messages = result.get("messages", [])
+        new_messages = messages[self._turn_start(messages):]
+        stream = self.stream or sys.stdout
+
+        if self.mode == "jsonl":
+            lines = [
+                json.dumps({"turn": turn_number, "step": step, "type": kind, "tool": tool_name,
+                            "text": text, "cached": cached}, ensure_ascii=False)
+                for step, kind, tool_name, text in self._steps(new_messages, cached)
+            ]
+            stream.write("\n".join(lines) + "\n" if lines else "")
+            stream.flush()
+            return
+
+        lines = [
+            f"\n{'='*60}",
+            f"  TURN {turn_number} - EXECUTION TRACE{' (CACHED)' if cached else ''}",
+            f"{'='*60}",
+        ]
+        labels = {
+            "user_input": "👤 USER INPUT",
+            "ai_response": "🤖 AI RESPONSE",
+            "cached_response": "⚡ CACHED RESPONSE",
+        }
+        last_step = None
+        for step, kind, tool_name, text in self._steps(new_messages, cached):
+            if kind == "tool_call":
+                # Several calls in one AI message share a step header
+                if step != last_step:
+                    lines.append(f"\n[Step {step}] 🤖 AI TOOL CALLS")
+                lines.append(f"  ├─ Tool: {tool_name}")
+                lines.append(f"  └─ Args: {text}")
+            elif kind == "tool_result":
+                lines.append(f"\n[Step {step}] 🔧 TOOL RESULT [{tool_name}]")
+                lines.append(f"  └─ {text}")
+            else:
+                lines.append(f"\n[Step {step}] {labels[kind]}")
+                lines.append(f"  └─ {text}")
+            last_step = step
+        lines.append(f"\n{'='*60}\n")
+
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
 
-    print(f"\n{'='*60}\n")
+def print_turn_history(result: dict, turn_number: int, cached: bool = False) -> None:
+    """Print a beautifully formatted history of the agent's turn. Cached turns are marked as such."""
+    TraceRenderer().render(result, turn_number, cached=cached)
 
 # Helper to extract the last AI response text
 def get_response_text(result):
@@ -61,4 +197,4 @@ def get_response_text(result):
     for msg in reversed(messages):
         if hasattr(msg, "content") and msg.content:
             return msg.content
-    return "(No response)"
\ No newline at end of file
+    return "(No response)"
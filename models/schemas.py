@@ -79,3 +79,50 @@ class ProfileStatus(BaseModel):
     status: StatusType = Field(..., description="Status of the profile operation")
     changes_content: str | None = Field(default=None, description="Details about changes made or errors encountered")
 
+
+# Batch portfolio review (nightly job) outputs
+class HoldingReview(BaseModel):
+    ticker: str = Field(..., description="Normalized ticker symbol of the holding")
+    security_type: SecurityType = Field(..., description="Type of the held security")
+    quantity: float | None = Field(default=None, description="Number of shares/units held, if known")
+    purchase_price: float | None = Field(default=None, description="Price per share when bought, if known")
+    current_price: float | None = Field(default=None, description="Latest price from the shared ticker fetch")
+    unrealized_return_pct: float | None = Field(default=None, description="Return since purchase in percent, if price data allows")
+    analysis: FundamentalAnalysis | None = Field(default=None, description="Shared fundamental analysis for this ticker")
+    error: str | None = Field(default=None, description="Why the ticker could not be analyzed, if it failed")
+
+class PortfolioReport(BaseModel):
+    user_id: str = Field(..., description="Profile id the report belongs to")
+    run_id: str = Field(..., description="Batch run that produced the report")
+    generated_at: str = Field(..., description="ISO timestamp of report generation")
+    risk_tolerance: float = Field(..., description="User's risk tolerance at review time")
+    time_horizon: float = Field(..., description="User's time horizon at review time")
+    holdings: list[HoldingReview] = Field(default_factory=list, description="Per-holding review entries")
+
+
+# Price alerts / threshold monitoring
+class AlertType(str, Enum):
+    TARGET_CROSS = "Target Cross"
+    DRAWDOWN = "Drawdown"
+    SCORE_BAND_DROP = "Score Band Drop"
+
+class AlertRule(BaseModel):
+    user_id: str = Field(..., description="Profile id the rule belongs to")
+    ticker: str = Field(..., description="Normalized ticker the rule watches")
+    alert_type: AlertType = Field(..., description="Condition the rule checks")
+    threshold: float | None = Field(default=None, gt=0.0, description="Drawdown percent that fires a DRAWDOWN rule")
+    reference_price: float | None = Field(default=None, gt=0.0, description="Price drawdown is measured from (purchase price)")
+    is_default: bool = Field(default=False, description="Generated from the profile; custom rules (False) survive regeneration")
+
+    @model_validator(mode="after")
+    def check_drawdown_fields(self) -> Self:
+        """Drawdown rules need both a threshold and a reference price."""
+        if self.alert_type == AlertType.DRAWDOWN and (self.threshold is None or self.reference_price is None):
+            raise ValueError("Drawdown rules require threshold and reference_price")
+        return self
+
+class FiredAlert(BaseModel):
+    rule: AlertRule = Field(..., description="Rule that fired")
+    fired_at: str = Field(..., description="ISO timestamp when the alert fired")
+    message: str = Field(..., description="Short, data-only description of what happened")
+    explanation: str | None = Field(default=None, description="LLM explanation for the user, generated only after firing")
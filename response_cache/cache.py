@@ -0,0 +1,193 @@
+"""
+Response cache for repeated user questions.
+
+Near-duplicate questions ("is AAPL a good buy?", "should I buy Apple stock")
+map to the same key: normalized intent + ticker set + profile fingerprint
+(risk and horizon buckets). Entries expire after a short TTL so answers never
+outlive the market data they were built from, and are persisted so they are
+shared across sessions. Only questions with an explicit intent and ticker are
+cached; turns stating personal facts always reach the agent.
+"""
+import json
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+from models.schemas import UserProfile
+from tools.profile_management import DATA_DIR, PROFILE_PATH
+
+CACHE_PATH = DATA_DIR / "cache" / "responses.sqlite3"
+
+# yfinance quotes are delayed ~15 minutes, so answers older than that are stale anyway
+DEFAULT_TTL_SECONDS = 15 * 60
+
+# Common company names users type instead of tickers
+COMPANY_TICKERS = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "tesla": "TSLA",
+    "amazon": "AMZN",
+    "google": "GOOGL",
+    "alphabet": "GOOGL",
+    "nvidia": "NVDA",
+    "meta": "META",
+    "facebook": "META",
+    "netflix": "NFLX",
+    "bitcoin": "BTC",
+    "sp500": "SPY",
+    "s&p": "SPY",
+}
+
+# Intent phrases, matched on word boundaries ("sell" doesn't match "sells off",
+# "buy" doesn't match "buyback"). A question matching several intents is ambiguous.
+INTENT_PHRASES = {
+    "sell_advice": ("sell", "get out of", "dump"),
+    "price_target": ("price target", "target price", "forecast", "analyst target"),
+    "fundamentals": ("fundamentals", "fundamental", "valuation", "p/e", "analyze", "analyse", "score"),
+    "buy_advice": ("buy", "invest in", "worth it", "good investment"),
+}
+
+INTENT_PATTERNS = {
+    intent: re.compile(r"(?<!\w)(?:" + "|".join(re.escape(phrase) for phrase in phrases) + r")(?!\w)")
+    for intent, phrases in INTENT_PHRASES.items()
+}
+
+# Uppercase words that look like tickers but aren't: common English words,
+# finance acronyms and every word of the intent phrases ("Is AAPL a good BUY?")
+NON_TICKER_WORDS = {
+    "I", "A", "AM", "AN", "AND", "OR", "IS", "IT", "ITS", "MY", "ME", "TO", "IN", "ON", "OF", "AT", "BY",
+    "BE", "DO", "DOES", "IF", "SO", "NO", "NOT", "DONT", "YES", "THE", "THIS", "THAT", "WHAT", "WHY",
+    "HOW", "WHEN", "NOW", "GOOD", "BAD", "BEST", "STOCK", "SHARE", "CAN", "WILL", "WOULD", "COULD",
+    "YOU", "YOUR", "WE", "OUR", "HOLD", "PRICE", "ABOUT", "RIGHT", "TODAY", "STILL", "REAL", "OK",
+    "ETF", "IPO", "CEO", "US", "USA", "USD", "PE", "EPS", "ROE", "ROA", "AI",
+} | {word.upper() for phrases in INTENT_PHRASES.values() for phrase in phrases for word in re.findall(r"[a-z]+", phrase)}
+
+# Turns that change the profile or state personal facts must always reach the agent
+UNCACHEABLE_PHRASES = ("my profile", "update my", "change my", "i own", "i bought", "i have", "i hold",
+                       "i already", "i'm holding", "my holdings", "my portfolio", "my position", "shares at")
+UNCACHEABLE_PATTERNS = (
+    re.compile(r"\$\s?\d"),  # dollar amounts ("$300", "$ 5000")
+    re.compile(r"\d+(?:\.\d+)?\s*(?:shares|units|%)"),  # quantities and percentages
+)
+UNCACHEABLE_PATTERN = re.compile(
+    r"(?<!\w)(?:" + "|".join(re.escape(phrase) for phrase in UNCACHEABLE_PHRASES) + r")(?!\w)"
+)
+
+TICKER_PATTERN = re.compile(r"\$?\b[A-Z]{1,5}\b")
+
+
+def extract_tickers(text: str) -> frozenset[str]:
+    """Tickers mentioned as symbols (AAPL, $TSLA) or well-known company names."""
+    tickers = {match.lstrip("$") for match in TICKER_PATTERN.findall(text)}
+    tickers -= NON_TICKER_WORDS
+    lowered = text.lower()
+    for name, ticker in COMPANY_TICKERS.items():
+        if re.search(rf"(?<!\w){re.escape(name)}(?!\w)", lowered):
+            tickers.add(ticker)
+    # Lowercase symbols ("aapl") are only recognized when they are known tickers
+    words = set(re.findall(r"\b[a-z]{1,5}\b", lowered))
+    tickers |= {ticker for ticker in COMPANY_TICKERS.values() if ticker.lower() in words}
+    return frozenset(tickers)
+
+
+def classify_intent(text: str) -> str | None:
+    """Normalized intent of the question, or None if none or several intents match."""
+    lowered = text.lower()
+    matched = [intent for intent, pattern in INTENT_PATTERNS.items() if pattern.search(lowered)]
+    return matched[0] if len(matched) == 1 else None
+
+
+def read_profile() -> UserProfile | None:
+    """Current stored profile, or None if missing/invalid."""
+    if not PROFILE_PATH.exists():
+        return None
+    try:
+        with open(PROFILE_PATH, "r") as file:
+            return UserProfile(**json.load(file))
+    except Exception:
+        return None
+
+
+def profile_fingerprint(profile: UserProfile | None) -> str:
+    """Risk and horizon buckets, using the same cut-offs as the profile manager's value mappings."""
+    if profile is None:
+        return "no_profile"
+
+    if profile.risk_tolerance <= 10:
+        risk = "conservative"
+    elif profile.risk_tolerance <= 20:
+        risk = "moderate"
+    else:
+        risk = "aggressive"
+
+    if profile.time_horizon <= 3:
+        horizon = "short"
+    elif profile.time_horizon <= 10:
+        horizon = "medium"
+    else:
+        horizon = "long"
+    return f"{risk}/{horizon}"
+
+
+def cache_key(user_input: str, profile: UserProfile | None) -> str | None:
+    """
+    Cache key for a user turn, or None if the turn must not be cached.
+
+    Follow-ups that lean on earlier context ("is it a good buy?") name no
+    ticker, so they are never cached.
+    """
+    lowered = user_input.lower()
+    if UNCACHEABLE_PATTERN.search(lowered) or any(pattern.search(lowered) for pattern in UNCACHEABLE_PATTERNS):
+        return None
+    intent = classify_intent(user_input)
+    tickers = extract_tickers(user_input)
+    if intent is None or not tickers:
+        return None
+    return f"{intent}|{','.join(sorted(tickers))}|{profile_fingerprint(profile)}"
+
+
+class ResponseCache:
+    """
+    TTL cache of final agent responses, stored per key in data/cache/responses.sqlite3.
+
+    Every get/put goes to the database, so concurrent sessions see each
+    other's answers and never overwrite each other's entries.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, path=CACHE_PATH):
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # A fresh connection per call keeps the cache safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def get(self, user_input: str, profile: UserProfile | None = None) -> str | None:
+        """Cached response for the turn, or None on miss/expiry/uncacheable turn."""
+        key = cache_key(user_input, profile)
+        if key is None:
+            return None
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT response FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, user_input: str, response: str, profile: UserProfile | None = None) -> None:
+        """Store a response if the turn is cacheable, dropping expired entries."""
+        key = cache_key(user_input, profile)
+        if key is None or not isinstance(response, str) or not response:
+            return
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                (key, response, now + self.ttl_seconds),
+            )
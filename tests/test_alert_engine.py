@@ -0,0 +1,112 @@
+from alerts.engine import AlertEngine, build_default_rules, merge_rules
+from models.schemas import AlertRule, AlertType, UserProfile
+
+
+def target_rule(ticker="AAPL"):
+    return AlertRule(user_id="alice", ticker=ticker, alert_type=AlertType.TARGET_CROSS)
+
+
+def drawdown_rule(reference_price=100.0, threshold=10.0):
+    return AlertRule(user_id="alice", ticker="AAPL", alert_type=AlertType.DRAWDOWN,
+                     threshold=threshold, reference_price=reference_price)
+
+
+def band_rule():
+    return AlertRule(user_id="alice", ticker="AAPL", alert_type=AlertType.SCORE_BAND_DROP)
+
+
+def make_profile(*holdings, risk_tolerance=10):
+    return UserProfile(risk_tolerance=risk_tolerance, time_horizon=10, investment_goal="growth",
+                       current_holdings=list(holdings))
+
+
+def test_first_price_only_seeds_target_cross():
+    engine = AlertEngine([target_rule()])
+    assert engine.on_price("AAPL", 210.0, target_mean=200.0) == []
+
+
+def test_target_cross_fires_in_both_directions():
+    engine = AlertEngine([target_rule()])
+    engine.on_price("AAPL", 190.0, target_mean=200.0)
+
+    up = engine.on_price("AAPL", 205.0, target_mean=200.0)
+    assert len(up) == 1 and "rose" in up[0].message
+    assert engine.on_price("AAPL", 210.0, target_mean=200.0) == []
+
+    down = engine.on_price("AAPL", 195.0, target_mean=200.0)
+    assert len(down) == 1 and "fell" in down[0].message
+
+
+def test_price_updates_only_evaluate_that_ticker():
+    engine = AlertEngine([target_rule("AAPL"), target_rule("MSFT")])
+    engine.on_price("MSFT", 390.0, target_mean=400.0)
+    assert engine.on_price("AAPL", 500.0, target_mean=400.0) == []
+
+
+def test_drawdown_fires_on_first_price_and_rearms():
+    engine = AlertEngine([drawdown_rule()])
+
+    fired = engine.on_price("AAPL", 85.0)
+    assert len(fired) == 1 and fired[0].rule.alert_type == AlertType.DRAWDOWN
+    assert engine.on_price("AAPL", 80.0) == []
+
+    assert engine.on_price("AAPL", 95.0) == []
+    assert len(engine.on_price("AAPL", 89.0)) == 1
+
+
+def test_drawdown_state_survives_restart():
+    engine = AlertEngine([drawdown_rule()])
+    engine.on_price("AAPL", 85.0)
+
+    restarted = AlertEngine([drawdown_rule()], engine.state())
+    assert restarted.on_price("AAPL", 84.0) == []
+
+
+def test_drawdown_is_tracked_per_lot():
+    engine = AlertEngine([drawdown_rule(reference_price=100.0), drawdown_rule(reference_price=200.0)])
+    fired = engine.on_price("AAPL", 150.0)
+    assert [alert.rule.reference_price for alert in fired] == [200.0]
+
+
+def test_score_band_drop():
+    engine = AlertEngine([band_rule()])
+    assert engine.on_score("AAPL", 8) == []  # seeds
+    assert engine.on_score("AAPL", 7) == []  # same band
+    fired = engine.on_score("AAPL", 5)
+    assert len(fired) == 1 and "strong band to neutral" in fired[0].message
+    assert engine.on_score("AAPL", 9) == []  # rising never fires
+
+
+def test_default_rules_keep_one_drawdown_per_lot():
+    profile = make_profile(
+        {"security_type": "Stock", "ticker": "aapl", "quantity": 1, "purchase_price": 100},
+        {"security_type": "Stock", "ticker": "AAPL", "quantity": 1, "purchase_price": 150},
+    )
+    rules = merge_rules([], {"alice": profile})
+    drawdowns = sorted(rule.reference_price for rule in rules if rule.alert_type == AlertType.DRAWDOWN)
+    assert drawdowns == [100.0, 150.0]
+    assert sum(rule.alert_type == AlertType.TARGET_CROSS for rule in rules) == 1
+
+
+def test_merge_drops_sold_holdings_and_follows_risk_tolerance():
+    old = make_profile(
+        {"security_type": "Stock", "ticker": "AAPL", "quantity": 1, "purchase_price": 100},
+        {"security_type": "Stock", "ticker": "MSFT", "quantity": 1, "purchase_price": 300},
+    )
+    new = make_profile({"security_type": "Stock", "ticker": "AAPL", "quantity": 1, "purchase_price": 100},
+                       risk_tolerance=20)
+
+    rules = merge_rules(build_default_rules({"alice": old}), {"alice": new})
+    assert {rule.ticker for rule in rules} == {"AAPL"}
+    assert [rule.threshold for rule in rules if rule.alert_type == AlertType.DRAWDOWN] == [20.0]
+
+
+def test_merge_keeps_custom_rules_and_unloadable_users():
+    profile = make_profile({"security_type": "Stock", "ticker": "AAPL", "quantity": 1, "purchase_price": 100})
+    custom = drawdown_rule(threshold=5.0)
+    bob = AlertRule(user_id="bob", ticker="TSLA", alert_type=AlertType.TARGET_CROSS, is_default=True)
+
+    rules = merge_rules([custom, bob], {"alice": profile}, keep_users={"bob"})
+    drawdowns = [rule for rule in rules if rule.alert_type == AlertType.DRAWDOWN]
+    assert [rule.threshold for rule in drawdowns] == [5.0]
+    assert bob in rules
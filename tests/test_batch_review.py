@@ -0,0 +1,61 @@
+from batch_review.runner import Checkpoint, build_report, collect_unique_tickers
+from models.schemas import UserProfile
+
+
+def make_profile(*holdings):
+    return UserProfile(risk_tolerance=15, time_horizon=10, investment_goal="growth", current_holdings=list(holdings))
+
+
+def test_only_stocks_and_etfs_are_scored():
+    profiles = {
+        "alice": make_profile(
+            {"security_type": "Stock", "ticker": "aapl ", "quantity": 10},
+            {"security_type": "Mutual Fund", "ticker": "Vanguard Wellington", "total_value": 5000},
+        ),
+        "bob": make_profile(
+            {"security_type": "ETF", "ticker": "SPY", "quantity": 5},
+            {"security_type": "Cryptocurrency", "ticker": "BTC", "total_value": 1000},
+            {"security_type": "Stock", "ticker": "AAPL", "quantity": 1},
+        ),
+    }
+    assert collect_unique_tickers(profiles) == ["AAPL", "SPY"]
+
+
+def test_report_marks_unscored_holdings():
+    profile = make_profile(
+        {"security_type": "Stock", "ticker": "AAPL", "quantity": 10, "purchase_price": 100},
+        {"security_type": "Bond", "ticker": "US10Y", "total_value": 1000},
+    )
+    results = {"AAPL": {"ticker": "AAPL", "current_price": 150.0, "analysis": None, "error": "boom"}}
+    report = build_report("alice", profile, "run", results)
+
+    stock, bond = report.holdings
+    assert stock.unrealized_return_pct == 50.0
+    assert stock.error == "boom"
+    assert bond.analysis is None
+    assert "not covered" in bond.error
+
+
+def test_checkpoint_last_line_wins(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    checkpoint.record("AAPL", {"current_price": 1.0, "analysis": None, "error": "boom"})
+    checkpoint.record("AAPL", {"current_price": 2.0, "analysis": {"score": 7}, "error": None})
+
+    reloaded = Checkpoint(path)
+    assert reloaded.is_done("AAPL")
+    assert reloaded.tickers["AAPL"]["current_price"] == 2.0
+
+
+
+def test_checkpoint_recovers_from_partial_line(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text('{"ticker": "AAPL", "analysis": {"score": 7}}\n{"ticker": "MS')
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.is_done("AAPL")
+    checkpoint.record("MSFT", {"current_price": 1.0, "analysis": {"score": 5}, "error": None})
+
+    reloaded = Checkpoint(path)
+    assert reloaded.is_done("AAPL")
+    assert reloaded.is_done("MSFT")
@@ -0,0 +1,93 @@
+import io
+import json
+
+from conversation_formatter.formatter import TraceRenderer, trim_text
+
+
+# Stubs: the renderer dispatches on the message class name
+class HumanMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class AIMessage:
+    def __init__(self, content="", tool_calls=None):
+        self.content = content
+        self.tool_calls = tool_calls or []
+
+
+class ToolMessage:
+    def __init__(self, content, name):
+        self.content = content
+        self.name = name
+
+
+def make_result():
+    return {"messages": [
+        HumanMessage("previous question"),
+        AIMessage("previous answer"),
+        HumanMessage("is AAPL a good buy?"),
+        AIMessage(tool_calls=[
+            {"name": "fundamental_analyst", "args": {"query": "AAPL " * 100}},
+            {"name": "profile_manager", "args": {}},
+        ]),
+        ToolMessage("score " * 50, "fundamental_analyst"),
+        AIMessage([{"type": "text", "text": "AAPL looks"}, {"type": "text", "text": "fairly valued."}]),
+    ]}
+
+
+def render(mode, cached=False):
+    stream = io.StringIO()
+    TraceRenderer(mode=mode, stream=stream).render(make_result(), 2, cached=cached)
+    return stream.getvalue()
+
+
+def test_trim_text_strings():
+    assert trim_text("keep  the\nspacing") == "keep  the\nspacing"
+    assert trim_text("a b c d", max_words=2) == "a b..."
+    assert trim_text("") == ""
+
+
+def test_trim_text_content_parts():
+    parts = [{"type": "text", "text": "hello there"}, "plain", {"type": "image_url"}]
+    assert trim_text(parts) == "hello there plain"
+    assert trim_text(parts, max_words=1) == "hello..."
+
+
+def test_text_trace_renders_only_the_current_turn():
+    output = render("text")
+    assert "previous" not in output
+    assert "TURN 2 - EXECUTION TRACE\n" in output
+    assert "[Step 1] 👤 USER INPUT" in output
+    assert output.count("[Step 2] 🤖 AI TOOL CALLS") == 1
+    assert "├─ Tool: profile_manager\n  └─ Args: (no args)" in output
+    assert "[Step 4] 🤖 AI RESPONSE\n  └─ AAPL looks fairly valued." in output
+
+
+def test_text_trace_truncates_large_tool_payloads():
+    output = render("text")
+    args_line = next(line for line in output.splitlines() if "Args: {" in line)
+    assert args_line.endswith("...")
+    assert args_line.count("AAPL") < 30
+
+
+def test_cached_turn_is_marked():
+    output = render("text", cached=True)
+    assert "EXECUTION TRACE (CACHED)" in output
+    assert "⚡ CACHED RESPONSE" in output
+
+
+def test_jsonl_schema():
+    records = [json.loads(line) for line in render("jsonl").splitlines()]
+    assert [(record["step"], record["type"]) for record in records] == [
+        (1, "user_input"),
+        (2, "tool_call"),
+        (2, "tool_call"),
+        (3, "tool_result"),
+        (4, "ai_response"),
+    ]
+    assert all(set(record) == {"turn", "step", "type", "tool", "text", "cached"} for record in records)
+    assert all(record["turn"] == 2 and record["cached"] is False for record in records)
+    assert records[1]["tool"] == "fundamental_analyst"
+    assert records[1]["text"].startswith('{"query": "AAPL AAPL')
+    assert records[0]["tool"] is None
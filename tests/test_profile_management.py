@@ -0,0 +1,23 @@
+import json
+
+import tools.profile_management as profile_management
+
+
+def write_profile(path, risk_tolerance):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"risk_tolerance": risk_tolerance, "time_horizon": 10, "investment_goal": "growth"}))
+
+
+def test_load_all_profiles_rejects_default_collision(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_management, "PROFILE_PATH", tmp_path / "user_profile.json")
+    monkeypatch.setattr(profile_management, "PROFILES_DIR", tmp_path / "profiles")
+    write_profile(tmp_path / "user_profile.json", 5)
+    write_profile(tmp_path / "profiles" / "default.json", 25)
+    write_profile(tmp_path / "profiles" / "bob.json", 15)
+    (tmp_path / "profiles" / "broken.json").write_text("{")
+
+    profiles, errors = profile_management.load_all_profiles()
+
+    assert set(profiles) == {"default", "bob"}
+    assert profiles["default"].risk_tolerance == 5
+    assert set(errors) == {"profiles/default", "broken"}
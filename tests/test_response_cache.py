@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from models.schemas import UserProfile
+from response_cache.cache import ResponseCache, cache_key, classify_intent, extract_tickers
+
+
+@pytest.mark.parametrize("first, second", [
+    ("is AAPL a good buy?", "should I buy Apple stock"),
+    ("is AAPL a good buy?", "Is AAPL a good BUY?"),
+    ("Should I NOT buy TSLA?", "should I buy TSLA"),
+    ("analyze msft", "Analyze MSFT"),
+])
+def test_near_duplicates_share_a_key(first, second):
+    assert cache_key(first, None) is not None
+    assert cache_key(first, None) == cache_key(second, None)
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("Should I buy AAPL before it sells off?", "buy_advice"),
+    ("should I sell AAPL", "sell_advice"),
+    ("what is the price target for NVDA", "price_target"),
+    ("Does AAPL's buyback program matter?", None),
+    ("analyze AAPL, is it a good buy?", None),  # ambiguous: fundamentals + buy
+])
+def test_classify_intent_uses_word_boundaries(text, intent):
+    assert classify_intent(text) == intent
+
+
+def test_buy_and_sell_questions_get_different_keys():
+    assert cache_key("Should I buy AAPL before it sells off?", None) != cache_key("should I sell AAPL", None)
+
+
+@pytest.mark.parametrize("text, tickers", [
+    ("Is AAPL a good BUY?", {"AAPL"}),
+    ("Should I NOT buy TSLA?", {"TSLA"}),
+    ("should I sell $NVDA", {"NVDA"}),
+    ("compare apple and microsoft", {"AAPL", "MSFT"}),
+    ("IS AAPL A GOOD BUY", {"AAPL"}),
+])
+def test_extract_tickers_ignores_capitalized_words(text, tickers):
+    assert extract_tickers(text) == tickers
+
+
+@pytest.mark.parametrize("text", [
+    "I want to buy TSLA but I already hold 50 shares at $300",
+    "I have $5000, should I buy AAPL?",
+    "update my profile, should I buy AAPL",
+    "hello",
+    "is it a good buy?",
+])
+def test_personal_or_incomplete_turns_are_not_cached(text):
+    assert cache_key(text, None) is None
+
+
+def test_profile_buckets_are_part_of_the_key():
+    conservative = UserProfile(risk_tolerance=5, time_horizon=20, investment_goal="retirement")
+    aggressive = UserProfile(risk_tolerance=25, time_horizon=20, investment_goal="retirement")
+    same_bucket = UserProfile(risk_tolerance=27, time_horizon=15, investment_goal="growth")
+    question = "is AAPL a good buy?"
+    assert cache_key(question, conservative) != cache_key(question, aggressive)
+    assert cache_key(question, aggressive) == cache_key(question, same_bucket)
+
+
+def test_cache_is_shared_between_instances(tmp_path):
+    path = tmp_path / "responses.sqlite3"
+    first, second = ResponseCache(path=path), ResponseCache(path=path)
+
+    first.put("is AAPL a good buy?", "Yes")
+    second.put("should I sell TSLA", "No")
+
+    assert second.get("should I buy Apple stock") == "Yes"
+    assert first.get("should I sell TSLA") == "No"
+
+
+def test_expired_entries_are_not_served_and_get_dropped(tmp_path):
+    path = tmp_path / "responses.sqlite3"
+    cache = ResponseCache(ttl_seconds=-1, path=path)
+    cache.put("is AAPL a good buy?", "Yes")
+    assert cache.get("is AAPL a good buy?") is None
+
+    ResponseCache(path=path).put("should I sell TSLA", "No")
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT key FROM responses").fetchall() == [("sell_advice|TSLA|no_profile",)]
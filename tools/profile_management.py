@@ -6,6 +6,7 @@ import json
 # Get absolute path to data directory relative to this file
 DATA_DIR = Path(__file__).parent.parent / "data"
 PROFILE_PATH = DATA_DIR / "user_profile.json"
+PROFILES_DIR = DATA_DIR / "profiles"
 
 
 @tool
@@ -108,3 +109,43 @@ def load_profile() -> str:
         return "Profile file is corrupted. Please create a new profile."
     except Exception as e:
         return f"Failed to load profile: {str(e)}"
+
+
+def normalize_ticker(ticker: str) -> str:
+    """Normalize a holding ticker so the same security dedups across users."""
+    return ticker.strip().upper()
+
+
+def load_all_profiles() -> tuple[dict[str, UserProfile], dict[str, str]]:
+    """
+    Load every stored user profile for batch jobs (not exposed to the LLM).
+
+    Profiles live in data/profiles/<user_id>.json. The legacy single-user
+    data/user_profile.json is included under the id "default"; a
+    data/profiles/default.json is rejected and reported in errors.
+
+    Returns:
+        tuple: (profiles keyed by user id, error messages keyed by user id)
+    """
+    paths = {}
+    errors = {}
+    if PROFILE_PATH.exists():
+        paths["default"] = PROFILE_PATH
+    if PROFILES_DIR.exists():
+        for path in sorted(PROFILES_DIR.glob("*.json")):
+            if path.stem in paths:
+                # Don't let data/profiles/default.json silently replace the legacy profile
+                errors[f"profiles/{path.stem}"] = f"User id '{path.stem}' is already taken by {paths[path.stem].name}; rename the file."
+                continue
+            paths[path.stem] = path
+
+    profiles = {}
+    for user_id, path in paths.items():
+        try:
+            with open(path, "r") as file:
+                profiles[user_id] = UserProfile(**json.load(file))
+        except json.JSONDecodeError:
+            errors[user_id] = "Profile file is corrupted."
+        except Exception as e:
+            errors[user_id] = f"Profile validation failed: {str(e)}"
+    return profiles, errors
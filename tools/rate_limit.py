@@ -0,0 +1,50 @@
+"""
+Shared rate limiting for LLM calls made outside the interactive agent
+(batch review, alert explanations).
+"""
+import threading
+import time
+
+# Markers Gemini / google-api-core put in quota errors
+RATE_LIMIT_MARKERS = ("429", "RESOURCE_EXHAUSTED", "rate limit", "quota")
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing LLM calls evenly across all workers."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the caller may issue the next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def back_off(self, seconds: float) -> None:
+        """Push the next slot for every worker out after a rate-limit response."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception looks like a provider rate-limit/quota error."""
+    message = str(error).lower()
+    return any(marker.lower() in message for marker in RATE_LIMIT_MARKERS)
+
+
+def call_with_rate_limit(limiter: RateLimiter, fn, *args, max_retries: int = 5, base_delay: float = 2.0):
+    """Run fn through the limiter, retrying with exponential backoff on rate-limit errors."""
+    for attempt in range(max_retries + 1):
+        limiter.wait()
+        try:
+            return fn(*args)
+        except Exception as e:
+            if attempt == max_retries or not is_rate_limit_error(e):
+                raise
+            limiter.back_off(base_delay * (2 ** attempt))